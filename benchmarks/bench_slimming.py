@@ -0,0 +1,91 @@
+"""Benchmark the split payload slimming stage with SLIM_UPLOAD_PAYLOAD off and on.
+
+Runs split_pdf_in_memory on a local PDF in each mode and reports the bytes
+that would be uploaded to Gemini, the time spent splitting, and an estimated
+upload time at a given bandwidth. No Gemini or Supabase calls are made.
+
+Usage:
+    python benchmarks/bench_slimming.py sample.pdf [--pages-per-split 1]
+        [--repeat 3] [--upload-mbps 20] [--downsample]
+"""
+import argparse
+import contextlib
+import io
+import pathlib
+import statistics
+import sys
+import time
+
+sys.path.insert(0, str(pathlib.Path(__file__).resolve().parent.parent))
+
+import cloud
+
+
+def run_mode(pdf_content: bytes, pdf_name: str, pages_per_split: int, repeat: int,
+             slim: bool, downsample: bool) -> dict:
+    """Split the PDF ``repeat`` times in one mode and return sizes and timings."""
+    cloud.SLIM_UPLOAD_PAYLOAD = slim
+    cloud.DOWNSAMPLE_IMAGES = downsample
+
+    timings = []
+    split_sizes = []
+    for run in range(repeat):
+        start = time.perf_counter()
+        with contextlib.redirect_stdout(io.StringIO()):
+            splits = cloud.split_pdf_in_memory(pdf_content, pages_per_split, f"{run}-{pdf_name}")
+        timings.append(time.perf_counter() - start)
+        split_sizes = [len(split_bytes) for split_bytes, _ in splits]
+
+    if not split_sizes:
+        raise SystemExit(f"Could not split {pdf_name}")
+
+    return {
+        "splits": len(split_sizes),
+        "upload_bytes": sum(split_sizes),
+        "largest_split_bytes": max(split_sizes),
+        "split_seconds": statistics.median(timings),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("pdf", type=pathlib.Path, help="PDF to split")
+    parser.add_argument("--pages-per-split", type=int, default=cloud.DEFAULT_PAGES_PER_SPLIT)
+    parser.add_argument("--repeat", type=int, default=3, help="runs per mode; the median time is reported")
+    parser.add_argument("--upload-mbps", type=float, default=20.0,
+                        help="upload bandwidth used to estimate upload time")
+    parser.add_argument("--downsample", action="store_true",
+                        help="also downsample scan images when slimming (requires Pillow)")
+    args = parser.parse_args()
+
+    if args.downsample and cloud.Image is None:
+        raise SystemExit("--downsample requires Pillow: pip install Pillow")
+
+    pdf_content = args.pdf.read_bytes()
+    results = {
+        "off": run_mode(pdf_content, args.pdf.name, args.pages_per_split, args.repeat, False, False),
+        "on": run_mode(pdf_content, args.pdf.name, args.pages_per_split, args.repeat, True, args.downsample),
+    }
+
+    bytes_per_second = args.upload_mbps * 1_000_000 / 8
+    print(f"PDF: {args.pdf} ({len(pdf_content) / (1024 * 1024):.2f} MB), "
+          f"{args.pages_per_split} page(s) per split, downsample: {args.downsample}")
+    print(f"{'SLIM_UPLOAD_PAYLOAD':<20}{'splits':>8}{'upload MB':>12}{'largest KB':>12}"
+          f"{'split s':>10}{'upload s':>10}{'total s':>10}")
+    for mode, result in results.items():
+        upload_seconds = result["upload_bytes"] / bytes_per_second
+        result["total_seconds"] = result["split_seconds"] + upload_seconds
+        print(f"{mode:<20}{result['splits']:>8}{result['upload_bytes'] / (1024 * 1024):>12.2f}"
+              f"{result['largest_split_bytes'] / 1024:>12.1f}{result['split_seconds']:>10.2f}"
+              f"{upload_seconds:>10.2f}{result['total_seconds']:>10.2f}")
+
+    saved = results["off"]["upload_bytes"] - results["on"]["upload_bytes"]
+    print(f"Upload volume saved: {saved / (1024 * 1024):.2f} MB "
+          f"({saved / results['off']['upload_bytes']:.1%})")
+    print(f"Estimated end-to-end change at {args.upload_mbps:g} Mbit/s: "
+          f"{results['on']['total_seconds'] - results['off']['total_seconds']:+.2f}s "
+          "(excludes Gemini processing time)")
+
+
+if __name__ == "__main__":
+    main()
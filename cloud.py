@@ -17,6 +17,7 @@ except ImportError:
 
 try:
     from PyPDF2 import PdfReader, PdfWriter
+    from PyPDF2.generic import NameObject, NumberObject
 except ImportError:
     print("CRITICAL ERROR: The 'PyPDF2' library is not installed.")
     print("Please install it by running: pip install PyPDF2")
@@ -29,6 +30,13 @@ except ImportError:
     print("Please install it by running: pip install supabase")
     exit(1)
 
+try:
+    from PIL import Image
+except ImportError:
+    Image = None
+
+from processing_status import ProcessingStatus
+
 #  i dont care about exposing my apis, kaam hone pr delete krna hain 
 
 SUPABASE_URL = "https://hprvnejxmmxmegoocvsr.supabase.co"
@@ -48,6 +56,23 @@ RETRY_DELAY = 5
 
 DEFAULT_PAGES_PER_SPLIT = 1
 
+# Follow-up requests allowed per split to recover truncated or missing records,
+# including one request per page when a split is re-split.
+MAX_RECOVERY_REQUESTS = 3
+# srNo values further apart than this start a new run; only the longest run is checked for gaps.
+MAX_SR_NO_GAP = 50
+# Splits with more missing srNo values than this are re-split or reported instead of targeted.
+MAX_MISSING_SR_NOS = 50
+
+# Payload slimming applied to each split before it is uploaded to Gemini.
+# Measure its effect with benchmarks/bench_slimming.py.
+SLIM_UPLOAD_PAYLOAD = True
+STRIP_METADATA = True
+STRIP_ANNOTATIONS = True
+DOWNSAMPLE_IMAGES = False  # requires Pillow
+TARGET_IMAGE_DPI = 200
+JPEG_QUALITY = 75
+
 OCR_PROMPT = """
 Act as an expert OCR extractor, Extract All the data As it is word by word. Do not summaries or reduce the length of content, Your goal is to extract all the pages properly as it is.
 
@@ -84,26 +109,19 @@ Output only the Export the extracted data in the following CSV field format (as
 }
 """
 
-PROCESSING_STATUS = {
-    "session_info": {
-        "start_time": None,
-        "end_time": None,
-        "total_pdfs": 0,
-        "successful_pdfs": 0,
-        "failed_pdfs": 0,
-        "api_usage_stats": {f"api_{i+1}": {"successful_calls": 0, "failed_calls": 0} for i in range(len(API_KEYS))},
-        "storage_stats": {
-            "files_downloaded": 0,
-            "files_uploaded": 0,
-            "total_download_size_mb": 0,
-            "total_upload_size_mb": 0
-        }
-    },
-    "pdf_results": {},
-    "failed_splits": [],
-    "global_errors": [],
-    "retry_attempts": []
-}
+CONTINUATION_PROMPT = """
+The previous extraction of this PDF was cut off after the record with srNo {last_sr_no}.
+Continue extracting, starting with the record that follows srNo {last_sr_no}.
+Output only the remaining records, in the same JSON object format.
+"""
+
+MISSING_RECORDS_PROMPT = """
+The previous extraction of this PDF skipped some records.
+Extract only the records with the following srNo values: {sr_nos}
+Output only those records, in the same JSON object format.
+"""
+
+PROCESSING_STATUS = ProcessingStatus(len(API_KEYS))
 
 current_api_index = 0
 gemini_clients = []
@@ -156,11 +174,7 @@ def initialize_supabase():
         
     except Exception as e:
         print(f"CRITICAL ERROR: Could not initialize Supabase client: {e}")
-        PROCESSING_STATUS["global_errors"].append({
-            "type": "supabase_setup_error",
-            "message": str(e),
-            "timestamp": datetime.now().isoformat()
-        })
+        PROCESSING_STATUS.record_global_error("supabase_setup_error", str(e))
         return False
 
 def list_input_pdfs() -> List[str]:
@@ -172,11 +186,7 @@ def list_input_pdfs() -> List[str]:
     except Exception as e:
         error_msg = f"Error listing PDF files from input bucket: {str(e)}"
         print(error_msg)
-        PROCESSING_STATUS["global_errors"].append({
-            "type": "supabase_list_error",
-            "message": error_msg,
-            "timestamp": datetime.now().isoformat()
-        })
+        PROCESSING_STATUS.record_global_error("supabase_list_error", error_msg)
         return []
 
 def download_pdf_from_supabase(file_name: str, local_path: pathlib.Path) -> bool:
@@ -188,8 +198,7 @@ def download_pdf_from_supabase(file_name: str, local_path: pathlib.Path) -> bool
             f.write(response)
         
         file_size_mb = len(response) / (1024 * 1024)
-        PROCESSING_STATUS["session_info"]["storage_stats"]["files_downloaded"] += 1
-        PROCESSING_STATUS["session_info"]["storage_stats"]["total_download_size_mb"] += file_size_mb
+        PROCESSING_STATUS.record_download(len(response))
         
         print(f"  Downloaded {file_name} ({file_size_mb:.2f} MB)")
         return True
@@ -197,12 +206,7 @@ def download_pdf_from_supabase(file_name: str, local_path: pathlib.Path) -> bool
     except Exception as e:
         error_msg = f"Error downloading {file_name}: {str(e)}"
         print(f"  {error_msg}")
-        PROCESSING_STATUS["global_errors"].append({
-            "type": "supabase_download_error",
-            "file_name": file_name,
-            "message": error_msg,
-            "timestamp": datetime.now().isoformat()
-        })
+        PROCESSING_STATUS.record_global_error("supabase_download_error", error_msg, file_name=file_name)
         return False
 
 def upload_file_to_supabase(local_path: pathlib.Path, remote_name: str, bucket_name: str = OUTPUT_BUCKET_NAME) -> bool:
@@ -214,8 +218,7 @@ def upload_file_to_supabase(local_path: pathlib.Path, remote_name: str, bucket_n
         response = supabase.storage.from_(bucket_name).upload(remote_name, file_content)
         
         file_size_mb = len(file_content) / (1024 * 1024)
-        PROCESSING_STATUS["session_info"]["storage_stats"]["files_uploaded"] += 1
-        PROCESSING_STATUS["session_info"]["storage_stats"]["total_upload_size_mb"] += file_size_mb
+        PROCESSING_STATUS.record_upload(len(file_content))
         
         print(f"  Uploaded {remote_name} to {bucket_name} ({file_size_mb:.2f} MB)")
         return True
@@ -223,13 +226,7 @@ def upload_file_to_supabase(local_path: pathlib.Path, remote_name: str, bucket_n
     except Exception as e:
         error_msg = f"Error uploading {remote_name} to {bucket_name}: {str(e)}"
         print(f"  {error_msg}")
-        PROCESSING_STATUS["global_errors"].append({
-            "type": "supabase_upload_error",
-            "file_name": remote_name,
-            "bucket": bucket_name,
-            "message": error_msg,
-            "timestamp": datetime.now().isoformat()
-        })
+        PROCESSING_STATUS.record_global_error("supabase_upload_error", error_msg, file_name=remote_name, bucket=bucket_name)
         return False
 
 def upload_status_to_supabase(status_data: dict) -> bool:
@@ -270,12 +267,7 @@ def initialize_gemini_clients():
         except Exception as e:
             print(f"ERROR: Could not initialize Gemini client {i+1}: {e}")
             gemini_clients.append(None)
-            PROCESSING_STATUS["global_errors"].append({
-                "type": "api_setup_error",
-                "api_index": i+1,
-                "message": str(e),
-                "timestamp": datetime.now().isoformat()
-            })
+            PROCESSING_STATUS.record_global_error("api_setup_error", str(e), api_index=i+1)
     
     valid_clients = [client for client in gemini_clients if client is not None]
     if not valid_clients:
@@ -307,76 +299,140 @@ def get_next_available_client() -> Tuple[Optional[genai.Client], int]:
 
 def update_api_stats(api_index: int, success: bool):
     """Update API usage statistics."""
-    if 0 <= api_index < len(API_KEYS):
-        api_key = f"api_{api_index + 1}"
-        if success:
-            PROCESSING_STATUS["session_info"]["api_usage_stats"][api_key]["successful_calls"] += 1
-        else:
-            PROCESSING_STATUS["session_info"]["api_usage_stats"][api_key]["failed_calls"] += 1
+    PROCESSING_STATUS.record_api_call(api_index, success)
 
 def initialize_pdf_status(pdf_name: str, total_splits: int) -> None:
     """Initialize status tracking for a PDF."""
-    PROCESSING_STATUS["pdf_results"][pdf_name] = {
-        "status": "processing",
-        "total_splits": total_splits,
-        "successful_splits": 0,
-        "failed_splits": 0,
-        "splits_details": {},
-        "start_time": datetime.now().isoformat(),
-        "end_time": None,
-        "errors": [],
-        "retry_count": 0
-    }
+    PROCESSING_STATUS.start_pdf(pdf_name, total_splits)
 
 def update_split_status(pdf_name: str, split_name: str, success: bool, error_message: str = None, retry_attempt: int = 0) -> None:
     """Update the status of a specific PDF split."""
-    if pdf_name not in PROCESSING_STATUS["pdf_results"]:
-        return
-    
-    pdf_status = PROCESSING_STATUS["pdf_results"][pdf_name]
-    
-    status_key = f"{split_name}_attempt_{retry_attempt}" if retry_attempt > 0 else split_name
-    
-    pdf_status["splits_details"][status_key] = {
-        "status": "success" if success else "failed",
-        "timestamp": datetime.now().isoformat(),
-        "error": error_message if not success else None,
-        "retry_attempt": retry_attempt
-    }
-    
-    if success:
-        pdf_status["successful_splits"] += 1
-    else:
-        if retry_attempt == MAX_RETRIES:
-            pdf_status["failed_splits"] += 1
-
-            PROCESSING_STATUS["failed_splits"].append({
-                "pdf_name": pdf_name,
-                "split_name": split_name,
-                "error": error_message,
-                "total_retries": retry_attempt,
-                "timestamp": datetime.now().isoformat()
-            })
+    PROCESSING_STATUS.record_split_attempt(
+        pdf_name, split_name, success, error_message, retry_attempt,
+        final=retry_attempt == MAX_RETRIES
+    )
 
 def finalize_pdf_status(pdf_name: str, overall_success: bool, final_error: str = None) -> None:
     """Finalize the status of a PDF processing."""
-    if pdf_name not in PROCESSING_STATUS["pdf_results"]:
-        return
-    
-    pdf_status = PROCESSING_STATUS["pdf_results"][pdf_name]
-    pdf_status["status"] = "completed" if overall_success else "failed"
-    pdf_status["end_time"] = datetime.now().isoformat()
-    
-    if final_error:
-        pdf_status["errors"].append({
-            "message": final_error,
-            "timestamp": datetime.now().isoformat()
-        })
-    
-    if overall_success:
-        PROCESSING_STATUS["session_info"]["successful_pdfs"] += 1
-    else:
-        PROCESSING_STATUS["session_info"]["failed_pdfs"] += 1
+    PROCESSING_STATUS.finish_pdf(pdf_name, overall_success, final_error)
+
+def serialized_size(obj) -> int:
+    """Return the number of bytes a PDF object takes when written out."""
+    stream = io.BytesIO()
+    obj.get_object().write_to_stream(stream, None)
+    return len(stream.getvalue())
+
+def downsample_page_images(page, seen_images: set) -> int:
+    """Re-encode a page's JPEG scan images at TARGET_IMAGE_DPI and JPEG_QUALITY.
+
+    Images are found in the page's XObjects and in nested Form XObjects, and
+    may use a filter list that ends in DCTDecode. The DPI of an image is
+    estimated against the page size, which holds for scanned rolls where each
+    image covers the whole page. Images shared between pages are only
+    re-encoded once. Returns the number of bytes saved.
+    """
+    page_width_in = float(page.mediabox.width) / 72
+    page_height_in = float(page.mediabox.height) / 72
+    saved = 0
+
+    pending = [page["/Resources"] if "/Resources" in page else None]
+    while pending:
+        resources = pending.pop()
+        if resources is None:
+            continue
+        xobjects = resources.get_object().get("/XObject")
+        if xobjects is None:
+            continue
+
+        for xobj in xobjects.get_object().values():
+            xobj = xobj.get_object()
+            if id(xobj) in seen_images:
+                continue
+            seen_images.add(id(xobj))
+
+            if xobj.get("/Subtype") == "/Form":
+                if "/Resources" in xobj:
+                    pending.append(xobj["/Resources"])
+                continue
+
+            filters = xobj.get("/Filter")
+            if isinstance(filters, list):
+                filters = filters[-1] if filters else None
+            if xobj.get("/Subtype") != "/Image" or filters != "/DCTDecode":
+                continue
+
+            original_size = len(xobj._data)
+            image = Image.open(io.BytesIO(xobj.get_data()))
+            if image.mode not in ("L", "RGB"):
+                continue
+
+            scale = min(1.0, max(TARGET_IMAGE_DPI * page_width_in / image.width,
+                                 TARGET_IMAGE_DPI * page_height_in / image.height))
+            if scale < 1.0:
+                new_size = (max(1, round(image.width * scale)), max(1, round(image.height * scale)))
+                image = image.resize(new_size, Image.LANCZOS)
+
+            image_stream = io.BytesIO()
+            image.save(image_stream, format="JPEG", quality=JPEG_QUALITY, optimize=True)
+            encoded = image_stream.getvalue()
+            if len(encoded) >= original_size:
+                continue
+
+            xobj._data = encoded
+            xobj.decoded_self = None
+            xobj[NameObject("/Filter")] = NameObject("/DCTDecode")
+            if "/DecodeParms" in xobj:
+                del xobj[NameObject("/DecodeParms")]
+            xobj[NameObject("/Width")] = NumberObject(image.width)
+            xobj[NameObject("/Height")] = NumberObject(image.height)
+            saved += original_size - len(encoded)
+
+    return saved
+
+def content_streams(page) -> list:
+    """Return the content stream objects of a page."""
+    if "/Contents" not in page:
+        return []
+    contents = page["/Contents"]
+    if isinstance(contents, list):
+        return [stream.get_object() for stream in contents]
+    return [contents]
+
+def slim_page(page, seen_images: set) -> int:
+    """Shrink a reader page in place before it is added to a split writer.
+
+    ``PdfWriter.add_page`` copies every object the page references, so the
+    page has to be slimmed before it is added. Metadata and annotations are
+    stripped, uncompressed content streams are compressed and, if enabled,
+    scan images are downsampled. Returns the estimated number of bytes saved.
+    """
+    saved = 0
+
+    if STRIP_ANNOTATIONS and "/Annots" in page:
+        saved += sum(serialized_size(annot) for annot in page["/Annots"])
+        del page[NameObject("/Annots")]
+
+    if STRIP_METADATA:
+        for key in ("/Metadata", "/PieceInfo", "/Thumb"):
+            if key in page:
+                saved += serialized_size(page[key])
+                del page[NameObject(key)]
+
+    if DOWNSAMPLE_IMAGES and Image is not None:
+        saved += downsample_page_images(page, seen_images)
+
+    streams = content_streams(page)
+    if any("/Filter" not in stream for stream in streams):
+        original_contents = page.raw_get("/Contents")
+        original_size = sum(len(stream._data) for stream in streams)
+        page.compress_content_streams()
+        compressed_size = len(page["/Contents"]._data)
+        if compressed_size < original_size:
+            saved += original_size - compressed_size
+        else:
+            page[NameObject("/Contents")] = original_contents
+
+    return saved
 
 def split_pdf_in_memory(pdf_content: bytes, pages_per_split: int, pdf_name: str) -> List[Tuple[bytes, str]]:
     """Split a PDF in memory and return list of (pdf_bytes, split_name) tuples."""
@@ -390,12 +446,20 @@ def split_pdf_in_memory(pdf_content: bytes, pages_per_split: int, pdf_name: str)
         
         total_splits = (total_pages + pages_per_split - 1) // pages_per_split
         initialize_pdf_status(pdf_name, total_splits)
+        seen_images = set()
 
         for i in range(0, total_pages, pages_per_split):
             pdf_writer = PdfWriter()
             end_page = min(i + pages_per_split, total_pages)
+            bytes_saved = 0
             for page_num in range(i, end_page):
-                pdf_writer.add_page(pdf_reader.pages[page_num])
+                page = pdf_reader.pages[page_num]
+                if SLIM_UPLOAD_PAYLOAD:
+                    try:
+                        bytes_saved += slim_page(page, seen_images)
+                    except Exception as e:
+                        print(f"  Warning: could not slim page {page_num + 1} of {pdf_name}: {str(e)}")
+                pdf_writer.add_page(page)
 
             output_stream = io.BytesIO()
             pdf_writer.write(output_stream)
@@ -403,25 +467,38 @@ def split_pdf_in_memory(pdf_content: bytes, pages_per_split: int, pdf_name: str)
             output_stream.close()
             
             split_name = f"{base_name}-split{i//pages_per_split:02d}.pdf"
+            PROCESSING_STATUS.record_split_payload(
+                pdf_name, split_name, len(split_pdf_bytes) + bytes_saved, len(split_pdf_bytes)
+            )
             split_pdfs.append((split_pdf_bytes, split_name))
             
-            print(f"  Created split: {split_name} (pages {i+1}-{end_page})")
+            print(f"  Created split: {split_name} (pages {i+1}-{end_page}, {bytes_saved / 1024:.1f} KB saved)")
 
         return split_pdfs
 
     except Exception as e:
         error_msg = f"Error splitting PDF {pdf_name}: {str(e)}"
         print(error_msg)
-        PROCESSING_STATUS["global_errors"].append({
-            "type": "pdf_split_error",
-            "pdf_name": pdf_name,
-            "message": error_msg,
-            "timestamp": datetime.now().isoformat()
-        })
+        PROCESSING_STATUS.record_global_error("pdf_split_error", error_msg, pdf_name=pdf_name)
         return []
 
-def gemini_ocr_pdf_with_retry(pdf_bytes: bytes, split_name: str, pdf_name: str) -> Optional[str]:
-    """Perform OCR on a PDF chunk with retry logic and backup APIs."""
+def response_was_cut_off(response) -> bool:
+    """Check whether Gemini stopped for any reason other than a natural stop."""
+    if not response.candidates:
+        return False
+    finish_reason = response.candidates[0].finish_reason
+    if finish_reason is None:
+        return False
+    return getattr(finish_reason, "name", str(finish_reason)) != "STOP"
+
+def gemini_ocr_pdf_with_retry(pdf_bytes: bytes, split_name: str, pdf_name: str,
+                              prompt: str = OCR_PROMPT, track_status: bool = True) -> Optional[Tuple[Optional[str], bool]]:
+    """Perform OCR on a PDF chunk with retry logic and backup APIs.
+
+    Returns the response text, which is None when Gemini sent no text, and
+    whether the response was cut off. Recovery requests pass
+    ``track_status=False`` so they do not count as split attempts.
+    """
     try:
         print(f"  Processing OCR for {split_name}...")
 
@@ -437,7 +514,8 @@ def gemini_ocr_pdf_with_retry(pdf_bytes: bytes, split_name: str, pdf_name: str)
                         time.sleep(RETRY_DELAY)
                         continue
                     else:
-                        update_split_status(pdf_name, split_name, False, error_msg, attempt)
+                        if track_status:
+                            update_split_status(pdf_name, split_name, False, error_msg, attempt)
                         update_api_stats(api_index, False)
                         return None
 
@@ -449,27 +527,23 @@ def gemini_ocr_pdf_with_retry(pdf_bytes: bytes, split_name: str, pdf_name: str)
 
                 try:
 
+                    PROCESSING_STATUS.record_gemini_upload(pdf_name, len(pdf_bytes))
                     file_ref = client.files.upload(file=temp_file_path)
                     
                     response = client.models.generate_content(
                         model=MODEL_ID,
-                        contents=[file_ref, OCR_PROMPT]
+                        contents=[file_ref, prompt]
                     )
 
                     print(f"  OCR completed for {split_name} (API {api_index + 1}, Attempt {attempt + 1})")
-                    update_split_status(pdf_name, split_name, True, None, attempt)
                     update_api_stats(api_index, True)
+
+                    if track_status:
+                        update_split_status(pdf_name, split_name, True, None, attempt)
+                        if attempt > 0:
+                            PROCESSING_STATUS.record_retry_success(pdf_name, split_name, attempt + 1, api_index + 1)
                     
-                    if attempt > 0:
-                        PROCESSING_STATUS["retry_attempts"].append({
-                            "pdf_name": pdf_name,
-                            "split_name": split_name,
-                            "successful_attempt": attempt + 1,
-                            "api_used": api_index + 1,
-                            "timestamp": datetime.now().isoformat()
-                        })
-                    
-                    return response.text
+                    return response.text, response_was_cut_off(response)
 
                 finally:
                     try:
@@ -487,15 +561,204 @@ def gemini_ocr_pdf_with_retry(pdf_bytes: bytes, split_name: str, pdf_name: str)
                     time.sleep(RETRY_DELAY)
                 else:
                     final_error = f"Failed after {MAX_RETRIES + 1} attempts. Last error: {error_msg}"
-                    update_split_status(pdf_name, split_name, False, final_error, attempt)
+                    if track_status:
+                        update_split_status(pdf_name, split_name, False, final_error, attempt)
                     return None
 
     except Exception as e:
         error_msg = f"Critical error processing {split_name}: {str(e)}"
         print(f"  {error_msg}")
-        update_split_status(pdf_name, split_name, False, error_msg, 0)
+        if track_status:
+            update_split_status(pdf_name, split_name, False, error_msg, 0)
+        return None
+
+def parse_ocr_records(ocr_text: str) -> Tuple[List[dict], bool]:
+    """Extract the complete JSON records from OCR output.
+
+    Returns the records and whether the output ends in a record that was cut
+    off part way through.
+    """
+    decoder = json.JSONDecoder()
+    records = []
+    pos = ocr_text.find("{")
+    last_end = 0
+
+    while pos != -1:
+        try:
+            record, end = decoder.raw_decode(ocr_text, pos)
+        except ValueError:
+            pos = ocr_text.find("{", pos + 1)
+            continue
+        if isinstance(record, dict):
+            records.append(record)
+        last_end = end
+        pos = ocr_text.find("{", end)
+
+    return records, "{" in ocr_text[last_end:]
+
+def sr_no_value(record: dict) -> Optional[int]:
+    """Return the numeric srNo of a record, or None if it is missing or not a number."""
+    try:
+        return int(str(record.get("srNo", "")).strip())
+    except ValueError:
         return None
 
+def main_sr_no_run(records: List[dict]) -> List[int]:
+    """Return the longest run of sorted srNo values with no jump above MAX_SR_NO_GAP.
+
+    This keeps a single misread srNo from stretching the expected sequence.
+    """
+    sr_nos = sorted({sr_no for sr_no in map(sr_no_value, records) if sr_no is not None})
+    if not sr_nos:
+        return []
+
+    runs = [[sr_nos[0]]]
+    for sr_no in sr_nos[1:]:
+        if sr_no - runs[-1][-1] > MAX_SR_NO_GAP:
+            runs.append([sr_no])
+        else:
+            runs[-1].append(sr_no)
+    return max(runs, key=len)
+
+def find_missing_sr_nos(records: List[dict]) -> List[int]:
+    """Find the srNo values missing from the main srNo run of the records."""
+    run = main_sr_no_run(records)
+    if not run:
+        return []
+    present = set(run)
+    return [sr_no for sr_no in range(run[0], run[-1] + 1) if sr_no not in present]
+
+def merge_ocr_records(records: List[dict], new_records: List[dict]) -> int:
+    """Add records whose srNo is not present yet; returns the number added."""
+    seen = {sr_no_value(record) for record in records}
+    added = 0
+    for record in new_records:
+        sr_no = sr_no_value(record)
+        if sr_no is None or sr_no in seen:
+            continue
+        records.append(record)
+        seen.add(sr_no)
+        added += 1
+    return added
+
+def split_into_pages(pdf_bytes: bytes) -> List[bytes]:
+    """Re-split a PDF chunk into single-page PDFs, slimming them like the original splits."""
+    pdf_reader = PdfReader(io.BytesIO(pdf_bytes))
+    pages = []
+    seen_images = set()
+    for page in pdf_reader.pages:
+        if SLIM_UPLOAD_PAYLOAD:
+            try:
+                slim_page(page, seen_images)
+            except Exception as e:
+                print(f"    Warning: could not slim re-split page: {str(e)}")
+        pdf_writer = PdfWriter()
+        pdf_writer.add_page(page)
+        output_stream = io.BytesIO()
+        pdf_writer.write(output_stream)
+        pages.append(output_stream.getvalue())
+        output_stream.close()
+    return pages
+
+def validate_and_recover_split(split_bytes: bytes, split_name: str, pdf_name: str,
+                               ocr_text: str, cut_off: bool) -> str:
+    """Validate OCR output for a split and re-OCR only what is missing.
+
+    Truncated output gets continuation requests and gaps in the srNo sequence
+    get targeted requests. If that does not finish the split and enough of
+    the MAX_RECOVERY_REQUESTS budget is left, a multi-page split is re-OCRed
+    page by page. Output that was cut off before its first complete record
+    is OCRed again first. Output without any JSON records that was not cut
+    off is returned unchanged and recorded as unvalidated.
+    """
+    records, partial = parse_ocr_records(ocr_text)
+    truncated = cut_off or partial
+    recovered = 0
+    recovery_requests = 0
+
+    if not records and truncated:
+        print(f"    {split_name} output was cut off before the first complete record, retrying...")
+        recovery_requests += 1
+        result = gemini_ocr_pdf_with_retry(split_bytes, split_name, pdf_name, track_status=False)
+        if result is not None and result[0]:
+            ocr_text, cut_off = result
+            records, partial = parse_ocr_records(ocr_text)
+            truncated = cut_off or partial
+            recovered += len(records)
+
+    if not records and not truncated:
+        print(f"    Validation skipped for {split_name}: no JSON records found")
+        PROCESSING_STATUS.record_split_validation(
+            pdf_name, split_name, 0, 0, False, recovered, recovery_requests, validated=False
+        )
+        return ocr_text
+
+    missing = find_missing_sr_nos(records)
+
+    while (truncated or missing) and recovery_requests < MAX_RECOVERY_REQUESTS:
+        if truncated:
+            run = main_sr_no_run(records)
+            if not run:
+                break
+            last_sr_no = run[-1]
+            print(f"    {split_name} output was cut off after srNo {last_sr_no}, requesting continuation...")
+            prompt = OCR_PROMPT + CONTINUATION_PROMPT.format(last_sr_no=last_sr_no)
+        elif len(missing) > MAX_MISSING_SR_NOS:
+            print(f"    {split_name} is missing {len(missing)} records, too many for a targeted request")
+            break
+        else:
+            print(f"    {split_name} is missing {len(missing)} record(s), requesting them...")
+            prompt = OCR_PROMPT + MISSING_RECORDS_PROMPT.format(sr_nos=", ".join(map(str, missing)))
+
+        recovery_requests += 1
+        result = gemini_ocr_pdf_with_retry(split_bytes, split_name, pdf_name, prompt=prompt, track_status=False)
+        if result is None or not result[0]:
+            break
+
+        new_records, new_partial = parse_ocr_records(result[0])
+        added = merge_ocr_records(records, new_records)
+        recovered += added
+        if truncated:
+            truncated = result[1] or new_partial
+        missing = find_missing_sr_nos(records)
+        if added == 0:
+            break
+
+    remaining_requests = MAX_RECOVERY_REQUESTS - recovery_requests
+    if (truncated or missing) and remaining_requests > 1:
+        page_count = len(PdfReader(io.BytesIO(split_bytes)).pages)
+        if 1 < page_count <= remaining_requests:
+            page_bytes = split_into_pages(split_bytes)
+            print(f"    Re-splitting {split_name} into {len(page_bytes)} single pages...")
+            pages_read = 0
+            pages_truncated = False
+            for page_num, single_page in enumerate(page_bytes, 1):
+                recovery_requests += 1
+                result = gemini_ocr_pdf_with_retry(single_page, f"{split_name} page {page_num}", pdf_name,
+                                                   track_status=False)
+                if result is None or not result[0]:
+                    continue
+                pages_read += 1
+                page_records, page_partial = parse_ocr_records(result[0])
+                recovered += merge_ocr_records(records, page_records)
+                pages_truncated = pages_truncated or result[1] or page_partial
+            truncated = pages_truncated or pages_read < len(page_bytes)
+            missing = find_missing_sr_nos(records)
+
+    records.sort(key=lambda record: (sr_no_value(record) is None, sr_no_value(record) or 0))
+    PROCESSING_STATUS.record_split_validation(
+        pdf_name, split_name, len(records), len(missing), truncated, recovered, recovery_requests
+    )
+
+    if recovered:
+        print(f"    Recovered {recovered} record(s) for {split_name}")
+    if truncated or missing:
+        print(f"    WARNING: {split_name} is still incomplete ({len(missing)} missing, truncated: {truncated})")
+
+    if not records:
+        return ocr_text
+    return json.dumps(records, indent=2, ensure_ascii=False)
+
 def create_zip_from_texts(ocr_results: Dict[str, str], pdf_name: str) -> Optional[bytes]:
     """Create a ZIP archive from OCR text results."""
     try:
@@ -515,12 +778,7 @@ def create_zip_from_texts(ocr_results: Dict[str, str], pdf_name: str) -> Optiona
     except Exception as e:
         error_msg = f"Error creating ZIP archive for {pdf_name}: {str(e)}"
         print(error_msg)
-        PROCESSING_STATUS["global_errors"].append({
-            "type": "zip_creation_error",
-            "pdf_name": pdf_name,
-            "message": error_msg,
-            "timestamp": datetime.now().isoformat()
-        })
+        PROCESSING_STATUS.record_global_error("zip_creation_error", error_msg, pdf_name=pdf_name)
         return None
 
 def process_single_pdf(pdf_name: str, pages_per_split: int) -> bool:
@@ -557,9 +815,12 @@ def process_single_pdf(pdf_name: str, pages_per_split: int) -> bool:
             ocr_results = {}
             for i, (split_bytes, split_name) in enumerate(split_pdfs, 1):
                 print(f"  Processing split {i}/{len(split_pdfs)}: {split_name}")
-                ocr_text = gemini_ocr_pdf_with_retry(split_bytes, split_name, pdf_name)
-                if ocr_text:
-                    ocr_results[split_name] = ocr_text
+                ocr_result = gemini_ocr_pdf_with_retry(split_bytes, split_name, pdf_name)
+                if ocr_result and ocr_result[0]:
+                    ocr_text, cut_off = ocr_result
+                    ocr_results[split_name] = validate_and_recover_split(
+                        split_bytes, split_name, pdf_name, ocr_text, cut_off
+                    )
             
             if not ocr_results:
                 error_msg = f"No OCR text was generated for {pdf_name}"
@@ -568,6 +829,12 @@ def process_single_pdf(pdf_name: str, pages_per_split: int) -> bool:
                 return False
             print(f"  Successfully generated {len(ocr_results)} OCR text results")
 
+            validation = PROCESSING_STATUS.validation_summary(pdf_name)
+            if validation.get("validated_splits"):
+                print(f"  Coverage: {validation['coverage']:.1%} ({validation['records']} records, "
+                      f"{validation['missing_records']} missing, {validation['recovered_records']} recovered "
+                      f"with {validation['recovery_requests']} follow-up requests)")
+
             print("Step 4: Creating ZIP archive and uploading to Supabase...")
             zip_bytes = create_zip_from_texts(ocr_results, pdf_name)
             
@@ -621,7 +888,7 @@ def main():
     print("=== Features: Retry Logic + Backup APIs ===")
     print("=======================================")
     
-    PROCESSING_STATUS["session_info"]["start_time"] = datetime.now().isoformat()
+    PROCESSING_STATUS.start_session()
     
     print("Initializing Supabase client...")
     if not initialize_supabase():
@@ -636,6 +903,12 @@ def main():
     print(f"Pages per Split:  {DEFAULT_PAGES_PER_SPLIT}")
     print(f"Max Retries:      {MAX_RETRIES}")
     print(f"Retry Delay:      {RETRY_DELAY}s")
+    print(f"Slim Uploads:     {SLIM_UPLOAD_PAYLOAD}")
+    if SLIM_UPLOAD_PAYLOAD and DOWNSAMPLE_IMAGES:
+        if Image is None:
+            print("WARNING: DOWNSAMPLE_IMAGES is enabled but Pillow is not installed. Images will not be downsampled.")
+        else:
+            print(f"Image Target:     {TARGET_IMAGE_DPI} DPI, JPEG quality {JPEG_QUALITY}")
     print("-" * 50)
 
     print("Fetching PDF files from Supabase...")
@@ -644,11 +917,11 @@ def main():
     if not pdf_files:
         print(f"No PDF files found in bucket '{INPUT_BUCKET_NAME}'.")
         print(f"Please upload your PDF files to the '{INPUT_BUCKET_NAME}' bucket in Supabase.")
-        PROCESSING_STATUS["session_info"]["total_pdfs"] = 0
-        upload_status_to_supabase(PROCESSING_STATUS)
+        PROCESSING_STATUS.total_pdfs = 0
+        upload_status_to_supabase(PROCESSING_STATUS.to_dict())
         return
 
-    PROCESSING_STATUS["session_info"]["total_pdfs"] = len(pdf_files)
+    PROCESSING_STATUS.total_pdfs = len(pdf_files)
     
     print(f"Found {len(pdf_files)} PDF(s) to process:")
     for pdf_file in pdf_files:
@@ -667,11 +940,12 @@ def main():
         else:
             failed_pipelines += 1
         
-        upload_status_to_supabase(PROCESSING_STATUS)
+        upload_status_to_supabase(PROCESSING_STATUS.to_dict())
         print("-" * 50)
 
-    PROCESSING_STATUS["session_info"]["end_time"] = datetime.now().isoformat()
-    upload_status_to_supabase(PROCESSING_STATUS)
+    PROCESSING_STATUS.end_session()
+    status_snapshot = PROCESSING_STATUS.to_dict()
+    upload_status_to_supabase(status_snapshot)
 
     print("\n=======================================")
     print("=== Pipeline Execution Summary ===")
@@ -681,16 +955,22 @@ def main():
     print(f"Failed to process:    {failed_pipelines}")
     print(f"Results saved in bucket: {OUTPUT_BUCKET_NAME}")
     
-    storage_stats = PROCESSING_STATUS["session_info"]["storage_stats"]
+    storage_stats = status_snapshot["session_info"]["storage_stats"]
     print(f"\n=== Storage Statistics ===")
     print(f"Files downloaded: {storage_stats['files_downloaded']}")
     print(f"Files uploaded: {storage_stats['files_uploaded']}")
     print(f"Total download size: {storage_stats['total_download_size_mb']:.2f} MB")
     print(f"Total upload size: {storage_stats['total_upload_size_mb']:.2f} MB")
+    print(f"Total split size: {storage_stats['total_split_size_mb']:.2f} MB")
+    print(f"Total slimmed split size: {storage_stats['total_slimmed_split_size_mb']:.2f} MB")
+    print(f"Total payload saved: {storage_stats['total_payload_saved_mb']:.2f} MB")
+    print(f"Gemini uploads: {storage_stats['gemini_files_uploaded']} "
+          f"({storage_stats['total_gemini_upload_size_mb']:.2f} MB)")
+    print(f"Total elapsed time: {status_snapshot['session_info']['elapsed_seconds']:.1f}s")
   
  
     print("\n=== API Usage Statistics ===")
-    for api_key, stats in PROCESSING_STATUS["session_info"]["api_usage_stats"].items():
+    for api_key, stats in status_snapshot["session_info"]["api_usage_stats"].items():
         successful = stats["successful_calls"]
         failed = stats["failed_calls"]
         total = successful + failed
@@ -698,7 +978,7 @@ def main():
             success_rate = (successful / total) * 100
             print(f"{api_key.upper()}: {successful} success, {failed} failed (Success rate: {success_rate:.1f}%)")
     
-    total_retries = len(PROCESSING_STATUS["retry_attempts"])
+    total_retries = len(status_snapshot["retry_attempts"])
     if total_retries > 0:
         print(f"\n=== Retry Statistics ===")
         print(f"Total successful retries: {total_retries}")
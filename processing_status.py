@@ -0,0 +1,394 @@
+"""Compact, thread-safe processing status store for the OCR pipeline.
+
+Split attempts are kept in array-backed columns with monotonic timestamps.
+The JSON document uploaded to Supabase is only built when ``to_dict`` is
+called, and keeps the shape of the original nested status dict.
+"""
+import threading
+import time
+from array import array
+from datetime import datetime
+from enum import IntEnum
+from typing import Dict, List, Optional, Tuple
+
+BYTES_PER_MB = 1024 * 1024
+
+
+class SplitState(IntEnum):
+    SUCCESS = 1
+    FAILED = 2
+
+
+class ValidationState(IntEnum):
+    PENDING = 0
+    VALIDATED = 1
+    UNVALIDATED = 2
+
+
+class PdfState(IntEnum):
+    PROCESSING = 1
+    COMPLETED = 2
+    FAILED = 3
+
+
+class _Clock:
+    """Monotonic clock that can render its readings as wall-clock ISO strings."""
+
+    __slots__ = ("_wall_anchor", "_mono_anchor")
+
+    def __init__(self):
+        self._wall_anchor = time.time()
+        self._mono_anchor = time.monotonic()
+
+    @staticmethod
+    def now() -> float:
+        return time.monotonic()
+
+    def isoformat(self, ts: Optional[float]) -> Optional[str]:
+        if ts is None:
+            return None
+        return datetime.fromtimestamp(self._wall_anchor + ts - self._mono_anchor).isoformat()
+
+
+class _PdfRecord:
+    """Per-PDF status with one row per split attempt in parallel arrays."""
+
+    __slots__ = (
+        "state", "total_splits", "successful_splits", "failed_splits",
+        "start_time", "end_time", "errors", "retry_count", "gemini_uploads", "gemini_upload_bytes",
+        "split_names", "split_index", "original_bytes", "upload_bytes",
+        "validation", "record_counts", "missing_counts", "truncated", "recovered_counts", "recovery_requests",
+        "attempt_split", "attempt_state", "attempt_retry", "attempt_time", "attempt_errors",
+    )
+
+    def __init__(self, total_splits: int, start_time: float):
+        self.state = PdfState.PROCESSING
+        self.total_splits = total_splits
+        self.successful_splits = 0
+        self.failed_splits = 0
+        self.start_time = start_time
+        self.end_time: Optional[float] = None
+        self.errors: List[Tuple[str, float]] = []
+        self.retry_count = 0
+        self.gemini_uploads = 0
+        self.gemini_upload_bytes = 0
+
+        self.split_names: List[str] = []
+        self.split_index: Dict[str, int] = {}
+        self.original_bytes = array("Q")
+        self.upload_bytes = array("Q")
+
+        self.validation = array("B")
+        self.record_counts = array("I")
+        self.missing_counts = array("I")
+        self.truncated = array("B")
+        self.recovered_counts = array("I")
+        self.recovery_requests = array("I")
+
+        self.attempt_split = array("I")
+        self.attempt_state = array("B")
+        self.attempt_retry = array("I")
+        self.attempt_time = array("d")
+        self.attempt_errors: Dict[int, str] = {}
+
+    def split_id(self, split_name: str) -> int:
+        idx = self.split_index.get(split_name)
+        if idx is None:
+            idx = len(self.split_names)
+            self.split_names.append(split_name)
+            self.split_index[split_name] = idx
+            self.original_bytes.append(0)
+            self.upload_bytes.append(0)
+            for column in (self.validation, self.record_counts, self.missing_counts,
+                           self.truncated, self.recovered_counts, self.recovery_requests):
+                column.append(0)
+        return idx
+
+    def validation_summary(self) -> dict:
+        validated = [idx for idx in range(len(self.split_names))
+                     if self.validation[idx] == ValidationState.VALIDATED]
+        records = sum(self.record_counts[idx] for idx in validated)
+        missing = sum(self.missing_counts[idx] for idx in validated)
+        return {
+            "validated_splits": len(validated),
+            "records": records,
+            "missing_records": missing,
+            "coverage": records / (records + missing) if records + missing else 1.0,
+            "truncated_splits": sum(self.truncated[idx] for idx in validated),
+            "recovered_records": sum(self.recovered_counts[idx] for idx in validated),
+            "recovery_requests": sum(self.recovery_requests),
+            "incomplete_splits": [
+                self.split_names[idx] for idx in validated
+                if self.missing_counts[idx] or self.truncated[idx]
+            ],
+            "unvalidated_splits": [
+                name for idx, name in enumerate(self.split_names)
+                if self.validation[idx] == ValidationState.UNVALIDATED
+            ],
+        }
+
+
+class ProcessingStatus:
+    """Session-wide processing status guarded by a single lock."""
+
+    def __init__(self, api_count: int):
+        self._lock = threading.Lock()
+        self._clock = _Clock()
+        self._api_count = api_count
+        self._api_success = array("Q", [0] * api_count)
+        self._api_failure = array("Q", [0] * api_count)
+
+        self.start_time: Optional[float] = None
+        self.end_time: Optional[float] = None
+        self.total_pdfs = 0
+        self._successful_pdfs = 0
+        self._failed_pdfs = 0
+
+        self._files_downloaded = 0
+        self._files_uploaded = 0
+        self._download_bytes = 0
+        self._upload_bytes = 0
+        self._gemini_uploads = 0
+        self._gemini_upload_bytes = 0
+
+        self._pdfs: Dict[str, _PdfRecord] = {}
+        self._failed_splits: List[Tuple[str, str, Optional[str], int, float]] = []
+        self._global_errors: List[Tuple[str, str, Optional[dict], float]] = []
+        self._retry_attempts: List[Tuple[str, str, int, int, float]] = []
+
+    def start_session(self) -> None:
+        self.start_time = self._clock.now()
+
+    def end_session(self) -> None:
+        self.end_time = self._clock.now()
+
+    def record_download(self, size_bytes: int) -> None:
+        with self._lock:
+            self._files_downloaded += 1
+            self._download_bytes += size_bytes
+
+    def record_upload(self, size_bytes: int) -> None:
+        with self._lock:
+            self._files_uploaded += 1
+            self._upload_bytes += size_bytes
+
+    def record_gemini_upload(self, pdf_name: str, size_bytes: int) -> None:
+        """Record a file sent to Gemini, including retries and recovery requests."""
+        with self._lock:
+            self._gemini_uploads += 1
+            self._gemini_upload_bytes += size_bytes
+            record = self._pdfs.get(pdf_name)
+            if record is not None:
+                record.gemini_uploads += 1
+                record.gemini_upload_bytes += size_bytes
+
+    def record_api_call(self, api_index: int, success: bool) -> None:
+        if not 0 <= api_index < self._api_count:
+            return
+        with self._lock:
+            if success:
+                self._api_success[api_index] += 1
+            else:
+                self._api_failure[api_index] += 1
+
+    def record_global_error(self, error_type: str, message: str, **extra) -> None:
+        with self._lock:
+            self._global_errors.append((error_type, message, extra or None, self._clock.now()))
+
+    def start_pdf(self, pdf_name: str, total_splits: int) -> None:
+        with self._lock:
+            self._pdfs[pdf_name] = _PdfRecord(total_splits, self._clock.now())
+
+    def record_split_payload(self, pdf_name: str, split_name: str, original_bytes: int, upload_bytes: int) -> None:
+        """Record the split size before and after payload slimming."""
+        with self._lock:
+            record = self._pdfs.get(pdf_name)
+            if record is None:
+                return
+            idx = record.split_id(split_name)
+            record.original_bytes[idx] = original_bytes
+            record.upload_bytes[idx] = upload_bytes
+
+    def record_split_validation(self, pdf_name: str, split_name: str, records: int, missing: int,
+                                truncated: bool, recovered: int, recovery_requests: int,
+                                validated: bool = True) -> None:
+        """Record the output validation and recovery result for a split.
+
+        ``validated=False`` marks output that could not be checked because it
+        had no JSON records.
+        """
+        with self._lock:
+            record = self._pdfs.get(pdf_name)
+            if record is None:
+                return
+            idx = record.split_id(split_name)
+            record.validation[idx] = ValidationState.VALIDATED if validated else ValidationState.UNVALIDATED
+            record.record_counts[idx] = records
+            record.missing_counts[idx] = missing
+            record.truncated[idx] = int(truncated)
+            record.recovered_counts[idx] = recovered
+            record.recovery_requests[idx] = recovery_requests
+
+    def validation_summary(self, pdf_name: str) -> dict:
+        """Return coverage and recovery counts for a PDF."""
+        with self._lock:
+            record = self._pdfs.get(pdf_name)
+            return record.validation_summary() if record is not None else {}
+
+    def record_split_attempt(self, pdf_name: str, split_name: str, success: bool,
+                             error_message: Optional[str], retry_attempt: int, final: bool) -> None:
+        """Record one OCR attempt; ``final`` marks a failure that exhausted all retries."""
+        with self._lock:
+            record = self._pdfs.get(pdf_name)
+            if record is None:
+                return
+
+            now = self._clock.now()
+            row = len(record.attempt_state)
+            # attempt_retry is the only column that can reject a value, so it is
+            # appended first to keep each row all-or-nothing.
+            record.attempt_retry.append(retry_attempt)
+            record.attempt_split.append(record.split_id(split_name))
+            record.attempt_state.append(SplitState.SUCCESS if success else SplitState.FAILED)
+            record.attempt_time.append(now)
+            if not success and error_message is not None:
+                record.attempt_errors[row] = error_message
+
+            if success:
+                record.successful_splits += 1
+            elif final:
+                record.failed_splits += 1
+                self._failed_splits.append((pdf_name, split_name, error_message, retry_attempt, now))
+
+    def record_retry_success(self, pdf_name: str, split_name: str, successful_attempt: int, api_used: int) -> None:
+        with self._lock:
+            record = self._pdfs.get(pdf_name)
+            if record is not None:
+                record.retry_count += 1
+            self._retry_attempts.append((pdf_name, split_name, successful_attempt, api_used, self._clock.now()))
+
+    def finish_pdf(self, pdf_name: str, success: bool, final_error: Optional[str] = None) -> None:
+        with self._lock:
+            record = self._pdfs.get(pdf_name)
+            if record is None:
+                return
+
+            now = self._clock.now()
+            record.state = PdfState.COMPLETED if success else PdfState.FAILED
+            record.end_time = now
+            if final_error:
+                record.errors.append((final_error, now))
+
+            if success:
+                self._successful_pdfs += 1
+            else:
+                self._failed_pdfs += 1
+
+    def to_dict(self) -> dict:
+        """Render the status as the JSON-compatible dict uploaded to Supabase."""
+        iso = self._clock.isoformat
+        with self._lock:
+            original_total = sum(sum(r.original_bytes) for r in self._pdfs.values())
+            upload_total = sum(sum(r.upload_bytes) for r in self._pdfs.values())
+
+            session_info = {
+                "start_time": iso(self.start_time),
+                "end_time": iso(self.end_time),
+                "total_pdfs": self.total_pdfs,
+                "successful_pdfs": self._successful_pdfs,
+                "failed_pdfs": self._failed_pdfs,
+                "api_usage_stats": {
+                    f"api_{i+1}": {
+                        "successful_calls": self._api_success[i],
+                        "failed_calls": self._api_failure[i],
+                    }
+                    for i in range(self._api_count)
+                },
+                "storage_stats": {
+                    "files_downloaded": self._files_downloaded,
+                    "files_uploaded": self._files_uploaded,
+                    "total_download_size_mb": self._download_bytes / BYTES_PER_MB,
+                    "total_upload_size_mb": self._upload_bytes / BYTES_PER_MB,
+                    "total_split_size_mb": original_total / BYTES_PER_MB,
+                    "total_slimmed_split_size_mb": upload_total / BYTES_PER_MB,
+                    "total_payload_saved_mb": (original_total - upload_total) / BYTES_PER_MB,
+                    "gemini_files_uploaded": self._gemini_uploads,
+                    "total_gemini_upload_size_mb": self._gemini_upload_bytes / BYTES_PER_MB,
+                },
+            }
+            if self.start_time is not None:
+                session_info["elapsed_seconds"] = round((self.end_time or self._clock.now()) - self.start_time, 3)
+
+            return {
+                "session_info": session_info,
+                "pdf_results": {name: self._render_pdf(record) for name, record in self._pdfs.items()},
+                "failed_splits": [
+                    {
+                        "pdf_name": pdf_name,
+                        "split_name": split_name,
+                        "error": error,
+                        "total_retries": retries,
+                        "timestamp": iso(ts),
+                    }
+                    for pdf_name, split_name, error, retries, ts in self._failed_splits
+                ],
+                "global_errors": [
+                    {"type": error_type, **(extra or {}), "message": message, "timestamp": iso(ts)}
+                    for error_type, message, extra, ts in self._global_errors
+                ],
+                "retry_attempts": [
+                    {
+                        "pdf_name": pdf_name,
+                        "split_name": split_name,
+                        "successful_attempt": attempt,
+                        "api_used": api_used,
+                        "timestamp": iso(ts),
+                    }
+                    for pdf_name, split_name, attempt, api_used, ts in self._retry_attempts
+                ],
+            }
+
+    def _render_pdf(self, record: _PdfRecord) -> dict:
+        iso = self._clock.isoformat
+
+        splits_details = {}
+        for row in range(len(record.attempt_state)):
+            split_name = record.split_names[record.attempt_split[row]]
+            retry_attempt = record.attempt_retry[row]
+            status_key = f"{split_name}_attempt_{retry_attempt}" if retry_attempt > 0 else split_name
+            splits_details[status_key] = {
+                "status": SplitState(record.attempt_state[row]).name.lower(),
+                "timestamp": iso(record.attempt_time[row]),
+                "error": record.attempt_errors.get(row),
+                "retry_attempt": retry_attempt,
+            }
+
+        payload_stats = {
+            split_name: {
+                "original_bytes": record.original_bytes[idx],
+                "upload_bytes": record.upload_bytes[idx],
+                "bytes_saved": record.original_bytes[idx] - record.upload_bytes[idx],
+            }
+            for idx, split_name in enumerate(record.split_names)
+            if record.original_bytes[idx]
+        }
+
+        rendered = {
+            "status": record.state.name.lower(),
+            "total_splits": record.total_splits,
+            "successful_splits": record.successful_splits,
+            "failed_splits": record.failed_splits,
+            "splits_details": splits_details,
+            "start_time": iso(record.start_time),
+            "end_time": iso(record.end_time),
+            "errors": [{"message": message, "timestamp": iso(ts)} for message, ts in record.errors],
+            "retry_count": record.retry_count,
+            "payload_stats": payload_stats,
+            "bytes_saved": sum(stats["bytes_saved"] for stats in payload_stats.values()),
+            "gemini_uploads": record.gemini_uploads,
+            "gemini_upload_bytes": record.gemini_upload_bytes,
+            "validation": record.validation_summary(),
+        }
+        if record.end_time is not None:
+            rendered["elapsed_seconds"] = round(record.end_time - record.start_time, 3)
+        return rendered